@@ -2,14 +2,20 @@
 Scooter API - Main Application
 A Flask-based REST API for scooter rental management
 """
+import atexit
 import logging
-from flask import Flask, send_from_directory, request, json
+import logging.handlers
+import queue
+from flask import Flask, send_from_directory, request
 from flask_cors import CORS
 from datetime import datetime
 
 # Import configuration
 from config import SECRET_KEY, MAX_PAYLOAD_SIZE
 
+# Import response helpers
+from utils.responses import error_response
+
 # Import database initialization
 from models.database import init_mongodb
 
@@ -29,13 +35,24 @@ app.secret_key = SECRET_KEY
 CORS(app, supports_credentials=True)
 
 # Configure logging
+# Request threads only enqueue records; a background listener does the file/stream I/O
+log_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+log_handlers = [
+    logging.FileHandler('scooter_api.log', encoding='utf-8'),
+    logging.StreamHandler()
+]
+for log_handler in log_handlers:
+    log_handler.setFormatter(log_formatter)
+
+log_queue = queue.Queue(-1)
+log_listener = logging.handlers.QueueListener(log_queue, *log_handlers, respect_handler_level=True)
+log_listener.start()
+atexit.register(log_listener.stop)  # Flush queued records on shutdown
+
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('scooter_api.log', encoding='utf-8'),
-        logging.StreamHandler()
-    ]
+    format='%(message)s',  # Full format is applied by the listener's handlers
+    handlers=[logging.handlers.QueueHandler(log_queue)]
 )
 logger = logging.getLogger(__name__)
 
@@ -58,12 +75,12 @@ app.register_blueprint(reports_bp)   # /admin/reports/*
 @app.before_request
 def before_request_handler():
     """Log and validate incoming requests"""
-    logger.info(f"Incoming request: {request.method} {request.path} from {request.remote_addr}")
+    logger.info("Incoming request: %s %s from %s", request.method, request.path, request.remote_addr)
     
     # Check content length to prevent huge payloads
     if request.content_length and request.content_length > MAX_PAYLOAD_SIZE:
         logger.warning(f"Request rejected: payload too large ({request.content_length} bytes)")
-        return json.dumps({'msg': 'Error 413 - Payload too large'}), 413, {'Content-Type': 'application/json'}
+        return error_response("Payload too large", 413)
     
     # Track request start time
     request.start_time = datetime.now()
@@ -75,7 +92,8 @@ def after_request_handler(response):
     # Calculate request duration
     if hasattr(request, 'start_time'):
         duration = (datetime.now() - request.start_time).total_seconds()
-        logger.info(f"Request completed: {request.method} {request.path} - Status: {response.status_code} - Duration: {duration:.3f}s")
+        logger.info("Request completed: %s %s - Status: %s - Duration: %.3fs",
+                    request.method, request.path, response.status_code, duration)
     
     # Add security headers
     response.headers['X-Content-Type-Options'] = 'nosniff'
@@ -92,25 +110,25 @@ def after_request_handler(response):
 @app.errorhandler(404)
 def not_found(error):
     logger.warning(f"404 Error: {request.url} not found")
-    return json.dumps({'msg': 'Error 404 - Resource not found'}), 404, {'Content-Type': 'application/json'}
+    return error_response("Resource not found", 404)
 
 
 @app.errorhandler(413)
 def payload_too_large(error):
     logger.warning("413 Error: Payload too large")
-    return json.dumps({'msg': 'Error 413 - Payload too large'}), 413, {'Content-Type': 'application/json'}
+    return error_response("Payload too large", 413)
 
 
 @app.errorhandler(500)
 def internal_error(error):
     logger.error(f"500 Error: {str(error)}")
-    return json.dumps({'msg': 'Error 500 - Internal server error'}), 500, {'Content-Type': 'application/json'}
+    return error_response("Internal server error", 500)
 
 
 @app.errorhandler(Exception)
 def handle_exception(error):
     logger.error(f"Unhandled exception: {str(error)}", exc_info=True)
-    return json.dumps({'msg': 'Error 500 - An unexpected error occurred'}), 500, {'Content-Type': 'application/json'}
+    return error_response("An unexpected error occurred", 500)
 
 
 # ==================
@@ -15,6 +15,14 @@ MONGO_DB_NAME = os.environ.get('MONGO_DB_NAME', 'scooter_db')
 SCOOTERS_COLLECTION = 'scooters'
 USERS_COLLECTION = 'users'
 
+# MongoDB Connection Pool
+MONGO_MAX_POOL_SIZE = int(os.environ.get('MONGO_MAX_POOL_SIZE', 200))
+MONGO_MIN_POOL_SIZE = int(os.environ.get('MONGO_MIN_POOL_SIZE', 10))
+MONGO_MAX_IDLE_TIME_MS = int(os.environ.get('MONGO_MAX_IDLE_TIME_MS', 300000))  # recycle idle sockets after 5 min
+MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.environ.get('MONGO_WAIT_QUEUE_TIMEOUT_MS', 2000))  # fail fast when pool is exhausted
+MONGO_COMPRESSORS = os.environ.get('MONGO_COMPRESSORS', 'zstd,zlib')  # zlib is stdlib - always available as a fallback
+MONGO_ZLIB_COMPRESSION_LEVEL = int(os.environ.get('MONGO_ZLIB_COMPRESSION_LEVEL', 3))  # favour speed over ratio
+
 # User Roles
 ROLE_ADMIN = 'admin'
 ROLE_RENTER = 'renter'
@@ -23,13 +31,20 @@ ROLE_RENTER = 'renter'
 DEFAULT_ADMIN_EMAIL = os.environ.get('DEFAULT_ADMIN_EMAIL', 'admin@scooter.com')
 DEFAULT_ADMIN_PASSWORD = os.environ.get('DEFAULT_ADMIN_PASSWORD', 'admin123')
 DEFAULT_ADMIN_NAME = 'Admin User'
+# Normalized once here the same way login normalizes input (strip + lowercase)
+DEFAULT_ADMIN_EMAIL_NORMALIZED = DEFAULT_ADMIN_EMAIL.strip().lower()
 
 # Validation Limits
 MAX_SEARCH_RADIUS = 50000  # meters (50km)
 MAX_SCOOTER_ID_LENGTH = 100
 MIN_PASSWORD_LENGTH = 6
+MAX_STRING_LENGTH = 2048  # Longest string value accepted by the sanitizer (bounds scan cost per field)
 MAX_PAYLOAD_SIZE = 10 * 1024 * 1024  # 10MB
 
+# Admin list pagination (items per page)
+ADMIN_PAGE_SIZE_DEFAULT = 200
+ADMIN_PAGE_SIZE_MAX = 1000
+
 # ===========================================
 # RENTAL PRICING CONFIGURATION
 # ===========================================
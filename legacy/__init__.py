@@ -0,0 +1,12 @@
+"""
+Legacy Package
+Tools for the original JSON file database (migration to and export from MongoDB)
+"""
+from legacy.json_db import (
+    iter_scooters,
+    load_scooters,
+    migrate_json_to_mongodb,
+    export_mongodb_to_json
+)
+
+__all__ = ['iter_scooters', 'load_scooters', 'migrate_json_to_mongodb', 'export_mongodb_to_json']
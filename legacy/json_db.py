@@ -0,0 +1,129 @@
+"""
+Legacy JSON File Database
+Moves scooter data between the original scooter_db.json file and MongoDB
+"""
+import json
+import logging
+import os
+
+from pymongo import ReplaceOne, errors as mongo_errors
+
+from config import DB_FILE
+from models.database import get_scooters_collection, buffered_writes
+from utils.geo import to_geojson_point
+from utils.validators import validate_coordinates
+
+logger = logging.getLogger(__name__)
+
+# Every scooter record in the JSON file must have these fields
+REQUIRED_SCOOTER_FIELDS = frozenset(('id', 'lat', 'lng', 'is_reserved'))
+
+
+def iter_scooters(db_file=DB_FILE):
+    """
+    Yield validated scooters from the legacy JSON file one at a time.
+    Records with missing fields or invalid coordinates (non-numeric, NaN/infinite or
+    out of range - the 2dsphere index would reject them) are skipped, as are
+    repeats of an id that was already yielded (the first record wins).
+    """
+    # Parse straight from the binary file - no intermediate text copy of the whole file
+    with open(db_file, 'rb') as f:
+        records = json.load(f)
+
+    if not isinstance(records, list):
+        raise ValueError(f"{db_file} must contain a JSON list of scooters")
+
+    seen_ids = set()
+    for record in records:
+        if not isinstance(record, dict):
+            logger.warning(f"Skipping non-object scooter record: {record!r}")
+            continue
+
+        missing_fields = REQUIRED_SCOOTER_FIELDS.difference(record)
+        if missing_fields:
+            logger.warning(f"Skipping scooter {record.get('id')}: missing fields {sorted(missing_fields)}")
+            continue
+
+        try:
+            scooter = {
+                'id': str(record['id']),
+                'lat': float(record['lat']),
+                'lng': float(record['lng']),
+                'is_reserved': bool(record['is_reserved'])
+            }
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Skipping scooter {record.get('id')}: {e}")
+            continue
+
+        is_valid, error = validate_coordinates(scooter['lat'], scooter['lng'], allow_null_island=True)
+        if not is_valid:
+            logger.warning(f"Skipping scooter {scooter['id']}: {error}")
+            continue
+
+        if scooter['id'] in seen_ids:
+            logger.warning(f"Skipping duplicate scooter id {scooter['id']} in {db_file}")
+            continue
+        seen_ids.add(scooter['id'])
+
+        scooter['location'] = to_geojson_point(scooter['lat'], scooter['lng'])
+        yield scooter
+
+
+def load_scooters(db_file=DB_FILE):
+    """
+    Load and validate all scooters from the legacy JSON file.
+
+    Returns: list of scooter dicts ready to store in MongoDB
+    """
+    return list(iter_scooters(db_file))
+
+
+def migrate_json_to_mongodb(db_file=DB_FILE):
+    """
+    Copy scooters from the legacy JSON file into MongoDB.
+    Scooters are streamed straight into bulk upserts by id, so the migration
+    never holds a second copy of the fleet and can safely be re-run.
+
+    Returns: (success: bool, message: str)
+    """
+    count = 0
+    try:
+        with buffered_writes(get_scooters_collection()) as push:
+            for scooter in iter_scooters(db_file):
+                push(ReplaceOne({'id': scooter['id']}, scooter, upsert=True))
+                count += 1
+    except FileNotFoundError:
+        return False, f"{db_file} not found"
+    except ValueError as e:
+        # json.JSONDecodeError is a ValueError subclass
+        return False, f"Could not read {db_file}: {e}"
+    except mongo_errors.BulkWriteError as e:
+        # Upserts by id - batches written before the failure are kept and a re-run is safe
+        write_errors = e.details.get('writeErrors', [])
+        logger.error(f"Bulk write failed while migrating {db_file}: {write_errors[:1]}")
+        return False, f"MongoDB rejected {len(write_errors)} scooter write(s) from {db_file}"
+
+    logger.info(f"Migrated {count} scooters from {db_file} to MongoDB")
+    return True, f"Migrated {count} scooters from {db_file}"
+
+
+def export_mongodb_to_json(output_file=DB_FILE):
+    """
+    Export all scooters from MongoDB to a JSON file.
+    Writes to a temp file first and swaps it in, so a crash never leaves a half-written file.
+
+    Returns: number of scooters exported
+    """
+    scooters = list(get_scooters_collection().find({}, {'_id': 0, 'location': 0}))
+
+    temp_file = f"{output_file}.tmp"
+    # Serialize in one go and write bytes - json.dump() would issue a text-mode write per token
+    with open(temp_file, 'wb') as f:
+        f.write(json.dumps(scooters, indent=2).encode('utf-8'))
+        # Make sure the data is on disk before the swap - cheaper than reading it back to verify
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_file, output_file)
+
+    logger.info(f"Exported {len(scooters)} scooters from MongoDB to {output_file}")
+    return len(scooters)
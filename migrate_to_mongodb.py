@@ -5,13 +5,15 @@ This script migrates scooter data from the JSON file database to MongoDB.
 Run this once after setting up MongoDB.
 
 Usage:
-    python migrate_to_mongodb.py
+    python migrate_to_mongodb.py                    # Import scooter_db.json, then backfill locations
+    python migrate_to_mongodb.py --backfill-only    # Only add missing GeoJSON locations
 
 Environment Variables:
     MONGO_URI - MongoDB connection string (default: mongodb://localhost:27017/)
     MONGO_DB_NAME - Database name (default: scooter_db)
 """
 
+import argparse
 import os
 import sys
 import logging
@@ -23,16 +25,43 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Import the migration function from app
+# Import the migration function
 try:
-    from app import init_mongodb, migrate_json_to_mongodb, export_mongodb_to_json
+    from models.database import init_mongodb, get_scooters_collection
+    from legacy import migrate_json_to_mongodb
 except ImportError as e:
-    logger.error(f"Failed to import app module: {e}")
-    logger.error("Make sure this script is in the same directory as app.py")
+    logger.error(f"Failed to import migration modules: {e}")
+    logger.error("Make sure this script is run from the project root directory")
     sys.exit(1)
 
+
+def backfill_locations():
+    """
+    Add the GeoJSON location used by /search to scooters stored before the 2dsphere index.
+    Scooters with missing or out-of-range lat/lng are left alone (the index would reject them).
+
+    Returns: (updated: int, skipped: int)
+    """
+    scooters = get_scooters_collection()
+    result = scooters.update_many(
+        {
+            "location": {"$exists": False},
+            "lat": {"$type": "number", "$gte": -90, "$lte": 90},
+            "lng": {"$type": "number", "$gte": -180, "$lte": 180}
+        },
+        [{"$set": {"location": {"type": "Point", "coordinates": ["$lng", "$lat"]}}}]
+    )
+    skipped = scooters.count_documents({"location": {"$exists": False}})
+    return result.modified_count, skipped
+
+
 def main():
     """Main migration function"""
+    parser = argparse.ArgumentParser(description='Migrate scooter data to MongoDB')
+    parser.add_argument('--backfill-only', action='store_true',
+                        help='Skip the JSON import and only add missing scooter locations')
+    args = parser.parse_args()
+    
     print("=" * 60)
     print("Scooter API - JSON to MongoDB Migration Tool")
     print("=" * 60)
@@ -58,24 +87,34 @@ def main():
     print()
     
     # Run migration
-    logger.info("Step 2: Migrating data from JSON to MongoDB...")
-    success, message = migrate_json_to_mongodb()
-    
-    if success:
+    if not args.backfill_only:
+        logger.info("Step 2: Migrating data from JSON to MongoDB...")
+        success, message = migrate_json_to_mongodb()
+        if not success:
+            print(f"[ERROR] Migration failed: {message}")
+            print()
+            print("Please check the error messages above and try again.")
+            return 1
         print(f"[SUCCESS] Migration successful: {message}")
         print()
+    
+    # Scooters already in MongoDB from before geo search need a GeoJSON location
+    logger.info("Step 3: Backfilling scooter locations...")
+    updated, skipped = backfill_locations()
+    print(f"[OK] Added locations to {updated} scooters")
+    if skipped:
+        print(f"[WARNING] {skipped} scooters have missing or invalid lat/lng and were skipped")
+        print("          They will not appear in /search until their coordinates are fixed")
+    print()
+    
+    if not args.backfill_only:
         print("Your scooter API is now using MongoDB!")
         print()
         print("Next steps:")
         print("1. Backup your scooter_db.json file")
         print("2. Test the API endpoints")
         print("3. You can now run: python app.py")
-        return 0
-    else:
-        print(f"[ERROR] Migration failed: {message}")
-        print()
-        print("Please check the error messages above and try again.")
-        return 1
+    return 0
 
 if __name__ == "__main__":
     try:
@@ -6,8 +6,14 @@ from models.database import (
     init_mongodb,
     get_scooters_collection,
     get_users_collection,
-    get_database
+    get_database,
+    find_users_by_ids,
+    find_scooters_by_ids,
+    buffered_writes
 )
 
-__all__ = ['init_mongodb', 'get_scooters_collection', 'get_users_collection', 'get_database']
+__all__ = [
+    'init_mongodb', 'get_scooters_collection', 'get_users_collection', 'get_database',
+    'find_users_by_ids', 'find_scooters_by_ids', 'buffered_writes'
+]
 
@@ -3,8 +3,14 @@ Database Connection Management
 Handles MongoDB connection and collection access
 """
 import logging
+from contextlib import contextmanager
 from pymongo import MongoClient, errors as mongo_errors
-from config import MONGO_URI, MONGO_DB_NAME, SCOOTERS_COLLECTION, USERS_COLLECTION, RENTALS_COLLECTION
+from config import (
+    MONGO_URI, MONGO_DB_NAME, SCOOTERS_COLLECTION, USERS_COLLECTION, RENTALS_COLLECTION,
+    MONGO_MAX_POOL_SIZE, MONGO_MIN_POOL_SIZE, MONGO_MAX_IDLE_TIME_MS,
+    MONGO_WAIT_QUEUE_TIMEOUT_MS, MONGO_COMPRESSORS, MONGO_ZLIB_COMPRESSION_LEVEL,
+    ROLE_ADMIN
+)
 
 logger = logging.getLogger(__name__)
 
@@ -15,6 +21,12 @@ _scooters_collection = None
 _users_collection = None
 _rentals_collection = None
 
+# Max operations sent per bulk_write() call
+BULK_WRITE_BATCH_SIZE = 1000
+
+# MongoDB server error code for dropping an index that doesn't exist
+INDEX_NOT_FOUND_CODE = 27
+
 
 def init_mongodb():
     """Initialize MongoDB connection"""
@@ -23,11 +35,19 @@ def init_mongodb():
     try:
         logger.info(f"Connecting to MongoDB at {MONGO_URI}")
         
-        # Create MongoDB client
+        # Create MongoDB client with a pre-warmed connection pool and wire compression
+        # (compressors whose library isn't installed are skipped by the driver)
         _mongo_client = MongoClient(
             MONGO_URI,
             serverSelectionTimeoutMS=5000,
-            connectTimeoutMS=5000
+            connectTimeoutMS=5000,
+            maxPoolSize=MONGO_MAX_POOL_SIZE,
+            minPoolSize=MONGO_MIN_POOL_SIZE,
+            maxIdleTimeMS=MONGO_MAX_IDLE_TIME_MS,
+            waitQueueTimeoutMS=MONGO_WAIT_QUEUE_TIMEOUT_MS,
+            retryWrites=True,
+            compressors=MONGO_COMPRESSORS,
+            zlibCompressionLevel=MONGO_ZLIB_COMPRESSION_LEVEL
         )
         
         # Test connection
@@ -43,18 +63,27 @@ def init_mongodb():
         # Create indexes for scooters
         _scooters_collection.create_index([("id", 1)], unique=True)
         _scooters_collection.create_index([("is_reserved", 1)])
-        _scooters_collection.create_index([("lat", 1), ("lng", 1)])
+        # Geo search always filters on availability, so keep is_reserved in the geo index
+        _scooters_collection.create_index([("location", "2dsphere"), ("is_reserved", 1)])
+        _drop_indexes(_scooters_collection, ["lat_1_lng_1"])
         
         # Create indexes for users
         _users_collection.create_index([("email", 1)], unique=True)
         _users_collection.create_index([("id", 1)], unique=True)
+        # Small partial index covering only admins (not unique - admins can promote others)
+        _users_collection.create_index(
+            [("role", 1)],
+            partialFilterExpression={"role": ROLE_ADMIN}
+        )
         
         # Create indexes for rentals
         _rentals_collection.create_index([("id", 1)], unique=True)
-        _rentals_collection.create_index([("user_id", 1)])
-        _rentals_collection.create_index([("scooter_id", 1)])
-        _rentals_collection.create_index([("status", 1)])
+        # Compound indexes follow the query shapes (equality fields first, then sort/range)
+        _rentals_collection.create_index([("user_id", 1), ("status", 1), ("start_time", -1)])
+        _rentals_collection.create_index([("scooter_id", 1), ("status", 1), ("start_time", -1)])
+        _rentals_collection.create_index([("status", 1), ("end_time", -1)])
         _rentals_collection.create_index([("start_time", -1)])
+        _drop_indexes(_rentals_collection, ["user_id_1", "scooter_id_1", "status_1"])
         
         logger.info(f"MongoDB initialized: database='{MONGO_DB_NAME}'")
         return True
@@ -70,6 +99,21 @@ def init_mongodb():
         return False
 
 
+def _drop_indexes(collection, index_names):
+    """Drop indexes superseded by compound ones, if an older deployment created them"""
+    existing = collection.index_information()
+    for name in index_names:
+        if name not in existing:
+            continue
+        try:
+            collection.drop_index(name)
+            logger.info(f"Dropped superseded index {collection.name}.{name}")
+        except mongo_errors.OperationFailure as e:
+            # Every worker runs this at startup - another one may have dropped it first
+            if e.code != INDEX_NOT_FOUND_CODE:
+                raise
+
+
 def get_scooters_collection():
     """Get scooters collection with connection check"""
     global _scooters_collection
@@ -116,3 +160,59 @@ def get_database():
     
     return _mongo_db
 
+
+def find_users_by_ids(user_ids, projection=None):
+    """
+    Fetch many users with a single $in query instead of one find_one per id.
+    Returns: dict of user id -> user document
+    """
+    user_ids = list(set(user_ids))
+    if not user_ids:
+        return {}
+    
+    if projection is None:
+        projection = {'_id': 0, 'password_hash': 0}
+    
+    users = get_users_collection().find({'id': {'$in': user_ids}}, projection)
+    return {user['id']: user for user in users}
+
+
+def find_scooters_by_ids(scooter_ids, projection=None):
+    """
+    Fetch many scooters with a single $in query instead of one find_one per id.
+    Returns: dict of scooter id -> scooter document
+    """
+    scooter_ids = list(set(scooter_ids))
+    if not scooter_ids:
+        return {}
+    
+    if projection is None:
+        projection = {'_id': 0, 'location': 0}
+    
+    scooters = get_scooters_collection().find({'id': {'$in': scooter_ids}}, projection)
+    return {scooter['id']: scooter for scooter in scooters}
+
+
+@contextmanager
+def buffered_writes(collection, batch_size=BULK_WRITE_BATCH_SIZE):
+    """
+    Buffer write operations and send them to MongoDB in bulk.
+    Yields a push(op) function taking pymongo write models (UpdateOne, ReplaceOne, ...).
+    Operations are flushed every batch_size ops and on exit, unordered so the
+    server can apply them in parallel - one round-trip per batch instead of per op.
+    If the with-body raises, ops still queued are discarded (batches already sent stay
+    written) and the exception propagates; a failed batch raises BulkWriteError.
+    """
+    ops = []
+
+    def push(op):
+        nonlocal ops
+        ops.append(op)
+        if len(ops) >= batch_size:
+            collection.bulk_write(ops, ordered=False)
+            ops = []
+
+    yield push
+
+    if ops:
+        collection.bulk_write(ops, ordered=False)
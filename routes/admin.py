@@ -3,19 +3,22 @@ Admin Routes
 Handles admin-only operations like user management and fleet management
 """
 import logging
-from flask import Blueprint, request, session
-from pymongo import errors as mongo_errors
+from flask import Blueprint, request, session, g
+from pymongo import errors as mongo_errors, ReadPreference
+from pymongo.read_concern import ReadConcern
 
 from models.database import get_users_collection, get_scooters_collection
 from utils.validators import (
-    validate_coordinates, validate_required_fields, 
-    validate_scooter_id, validate_request_json, sanitize_string
+    validate_coordinates_strict, validate_required_fields, 
+    validate_scooter_id, validate_request_json, sanitize_string,
+    validate_page_limit
 )
 from utils.responses import (
     success_response, created_response, validation_error,
     not_found_response, server_error_response
 )
 from utils.auth import admin_required
+from utils.geo import to_geojson_point
 from config import ROLE_ADMIN, ROLE_RENTER
 
 logger = logging.getLogger(__name__)
@@ -24,19 +27,54 @@ logger = logging.getLogger(__name__)
 admin_bp = Blueprint('admin', __name__, url_prefix='/admin')
 
 
+@admin_bp.before_request
+def load_admin_identity():
+    """Read the acting admin's identity from the session once per request"""
+    g.admin_email = session.get('email')
+    g.admin_user_id = session.get('user_id')
+
+
+# Fields returned by the user listing (skips password_hash, address, payment_method)
+USER_LIST_PROJECTION = {'_id': 0, 'id': 1, 'email': 1, 'name': 1, 'role': 1, 'created_at': 1, 'is_active': 1}
+
+# Fields accepted in scooter create/update bodies
+SCOOTER_CREATE_FIELDS = frozenset(('id', 'lat', 'lng'))
+SCOOTER_UPDATE_FIELDS = frozenset(('lat', 'lng'))
+
+
 @admin_bp.route('/users', methods=['GET'])
 @admin_required
 def get_all_users():
-    """Get all users (admin only)"""
-    logger.info(f"Request received: GET /admin/users (admin: {session.get('email')})")
+    """
+    Get users, one page at a time, ordered by id (admin only).
+    Query params:
+        - limit: page size (default 200, max 1000)
+        - after_id: return users after this id (the previous page's next_after_id)
+    """
+    logger.info("Request received: GET /admin/users (admin: %s)", g.admin_email)
+    
+    is_valid, limit = validate_page_limit(request.args.get('limit'))
+    if not is_valid:
+        return validation_error(limit)
+    
+    is_valid, after_id = sanitize_string(request.args.get('after_id'), "after_id")
+    if not is_valid:
+        return validation_error(after_id)
     
     try:
-        users = get_users_collection()
-        all_users = list(users.find({}, {'_id': 0, 'password_hash': 0}))
+        # Listings tolerate slight staleness - let a secondary serve them and keep the primary for writes
+        users = get_users_collection().with_options(
+            read_preference=ReadPreference.SECONDARY_PREFERRED,
+            read_concern=ReadConcern('local')
+        )
+        query = {'id': {'$gt': after_id}} if after_id else {}
+        # batch_size == limit fetches the whole page in the first reply (the server default is 101 docs)
+        page = list(users.find(query, USER_LIST_PROJECTION).sort('id', 1).limit(limit).batch_size(limit))
         
         return success_response({
-            'count': len(all_users),
-            'users': all_users
+            'count': len(page),
+            'users': page,
+            'next_after_id': page[-1]['id'] if len(page) == limit else None
         })
         
     except Exception as e:
@@ -48,7 +86,7 @@ def get_all_users():
 @admin_required
 def update_user_role(user_id):
     """Update a user's role (admin only)"""
-    logger.info(f"Request received: PUT /admin/users/{user_id}/role (admin: {session.get('email')})")
+    logger.info("Request received: PUT /admin/users/%s/role (admin: %s)", user_id, g.admin_email)
     
     try:
         data = request.get_json()
@@ -60,7 +98,7 @@ def update_user_role(user_id):
             return validation_error(f'Invalid role. Must be "{ROLE_ADMIN}" or "{ROLE_RENTER}"')
         
         # Prevent admin from demoting themselves
-        if user_id == session.get('user_id') and new_role != ROLE_ADMIN:
+        if user_id == g.admin_user_id and new_role != ROLE_ADMIN:
             return validation_error("Cannot demote yourself")
         
         users = get_users_collection()
@@ -69,7 +107,7 @@ def update_user_role(user_id):
         if result.matched_count == 0:
             return not_found_response("User")
         
-        logger.info(f"User {user_id} role updated to {new_role} by {session.get('email')}")
+        logger.info(f"User {user_id} role updated to {new_role} by {g.admin_email}")
         return success_response(message=f"User role updated to {new_role}")
         
     except Exception as e:
@@ -84,32 +122,53 @@ def manage_scooters():
     
     if request.method == 'GET':
         # Get all scooters in the fleet - both available and reserved
-        logger.info(f"Request received: GET /admin/scooters (admin: {session.get('email')})")
+        logger.info("Request received: GET /admin/scooters (admin: %s)", g.admin_email)
+        
+        is_valid, limit = validate_page_limit(request.args.get('limit'))
+        if not is_valid:
+            return validation_error(limit)
+        
+        # after_id is an opaque cursor echoing a stored id (legacy imports may hold any
+        # characters) - only screen it for injection, like GET /admin/users does
+        is_valid, after_id = sanitize_string(request.args.get('after_id'), "after_id")
+        if not is_valid:
+            return validation_error(after_id)
         
         try:
-            collection = get_scooters_collection()
-            all_scooters = list(collection.find({}, {'_id': 0}))
+            # Listings tolerate slight staleness - let a secondary serve them and keep the primary for writes
+            collection = get_scooters_collection().with_options(
+                read_preference=ReadPreference.SECONDARY_PREFERRED,
+                read_concern=ReadConcern('local')
+            )
+            query = {'id': {'$gt': after_id}} if after_id else {}
+            page = list(
+                collection.find(query, {'_id': 0, 'location': 0}).sort('id', 1).limit(limit).batch_size(limit)
+            )
             
-            # Calculate stats
-            total = len(all_scooters)
-            available = sum(1 for s in all_scooters if not s.get('is_reserved', False))
-            reserved = total - available
+            response = {
+                'scooters': page,
+                'next_after_id': page[-1]['id'] if len(page) == limit else None
+            }
             
-            return success_response({
-                'stats': {
+            # Calculate stats on the server, once per listing (first page only) - the total comes
+            # from collection metadata and the reserved count is answered from the is_reserved index
+            if not after_id:
+                total = collection.estimated_document_count()
+                reserved = collection.count_documents({'is_reserved': True})
+                response['stats'] = {
                     'total': total,
-                    'available': available,
+                    'available': total - reserved,
                     'reserved': reserved
-                },
-                'scooters': all_scooters
-            })
+                }
+            
+            return success_response(response)
             
         except Exception as e:
             logger.error(f"Error getting scooters: {e}", exc_info=True)
             return server_error_response("Failed to get scooters")
     
     # POST - Add a new scooter
-    logger.info(f"Request received: POST /admin/scooters (admin: {session.get('email')})")
+    logger.info("Request received: POST /admin/scooters (admin: %s)", g.admin_email)
     
     try:
         data = request.get_json()
@@ -117,9 +176,9 @@ def manage_scooters():
             return validation_error("Request body must be JSON")
         
         # Security: Validate and sanitize request body
-        is_valid, result = validate_request_json(data, allowed_fields=['id', 'lat', 'lng'])
+        is_valid, result = validate_request_json(data, allowed_fields=SCOOTER_CREATE_FIELDS)
         if not is_valid:
-            logger.warning(f"Security: Invalid request body from {session.get('email')}: {result}")
+            logger.warning(f"Security: Invalid request body from {g.admin_email}: {result}")
             return validation_error(result)
         
         # Validate required fields
@@ -134,7 +193,7 @@ def manage_scooters():
         scooter_id = result
         
         # Validate coordinates (with US bounds check for scooter placement)
-        is_valid, result = validate_coordinates(data['lat'], data['lng'], check_us_bounds=True)
+        is_valid, result = validate_coordinates_strict(data['lat'], data['lng'])
         if not is_valid:
             return validation_error(result)
         
@@ -144,13 +203,14 @@ def manage_scooters():
             'id': scooter_id,
             'lat': lat,
             'lng': lng,
+            'location': to_geojson_point(lat, lng),
             'is_reserved': False
         }
         
         collection = get_scooters_collection()
         collection.insert_one(new_scooter)
         
-        logger.info(f"New scooter added: {scooter_id} at ({lat}, {lng}) by {session.get('email')}")
+        logger.info(f"New scooter added: {scooter_id} at ({lat}, {lng}) by {g.admin_email}")
         return created_response({
             'scooter': {'id': scooter_id, 'lat': lat, 'lng': lng, 'is_reserved': False}
         }, "Scooter added successfully")
@@ -173,28 +233,25 @@ def force_release_scooter(scooter_id):
         return validation_error(result)
     scooter_id = result
     
-    logger.info(f"Request received: PUT /admin/scooters/{scooter_id}/release (admin: {session.get('email')})")
+    logger.info("Request received: PUT /admin/scooters/%s/release (admin: %s)", scooter_id, g.admin_email)
     
     try:
         collection = get_scooters_collection()
         
-        scooter = collection.find_one({'id': scooter_id})
-        if not scooter:
-            return not_found_response("Scooter")
-        
-        if not scooter.get('is_reserved', False):
-            return validation_error("Scooter is not currently reserved")
-        
+        # Release atomically - only matches if the scooter is still reserved
         result = collection.update_one(
-            {'id': scooter_id},
+            {'id': scooter_id, 'is_reserved': True},
             {'$set': {'is_reserved': False}}
         )
         
-        if result.modified_count > 0:
-            logger.warning(f"Scooter {scooter_id} force released by admin {session.get('email')}")
-            return success_response(message=f"Scooter {scooter_id} has been released")
-        else:
-            return server_error_response("Failed to release scooter")
+        if result.matched_count == 0:
+            # Second lookup only on failure, to tell "missing" from "not reserved"
+            if collection.find_one({'id': scooter_id}, {'_id': 1}) is None:
+                return not_found_response("Scooter")
+            return validation_error("Scooter is not currently reserved")
+        
+        logger.warning(f"Scooter {scooter_id} force released by admin {g.admin_email}")
+        return success_response(message=f"Scooter {scooter_id} has been released")
         
     except Exception as e:
         logger.error(f"Error releasing scooter: {e}", exc_info=True)
@@ -212,26 +269,22 @@ def delete_scooter(scooter_id):
         return validation_error(result)
     scooter_id = result
     
-    logger.info(f"Request received: DELETE /admin/scooters/{scooter_id} (admin: {session.get('email')})")
+    logger.info("Request received: DELETE /admin/scooters/%s (admin: %s)", scooter_id, g.admin_email)
     
     try:
         collection = get_scooters_collection()
         
-        # Check if scooter exists and is not reserved
-        scooter = collection.find_one({'id': scooter_id})
-        if not scooter:
-            return not_found_response("Scooter")
+        # Delete atomically - a reserved scooter never matches
+        result = collection.delete_one({'id': scooter_id, 'is_reserved': {'$ne': True}})
         
-        if scooter.get('is_reserved', False):
+        if result.deleted_count == 0:
+            # Second lookup only on failure, to tell "missing" from "reserved"
+            if collection.find_one({'id': scooter_id}, {'_id': 1}) is None:
+                return not_found_response("Scooter")
             return validation_error("Cannot delete a reserved scooter")
         
-        result = collection.delete_one({'id': scooter_id})
-        
-        if result.deleted_count > 0:
-            logger.info(f"Scooter {scooter_id} deleted by {session.get('email')}")
-            return success_response(message=f"Scooter {scooter_id} deleted successfully")
-        else:
-            return not_found_response("Scooter")
+        logger.info(f"Scooter {scooter_id} deleted by {g.admin_email}")
+        return success_response(message=f"Scooter {scooter_id} deleted successfully")
         
     except Exception as e:
         logger.error(f"Error deleting scooter: {e}", exc_info=True)
@@ -249,7 +302,7 @@ def update_scooter(scooter_id):
         return validation_error(result)
     scooter_id = result
     
-    logger.info(f"Request received: PUT /admin/scooters/{scooter_id} (admin: {session.get('email')})")
+    logger.info("Request received: PUT /admin/scooters/%s (admin: %s)", scooter_id, g.admin_email)
     
     try:
         data = request.get_json()
@@ -257,33 +310,31 @@ def update_scooter(scooter_id):
             return validation_error("Request body must be JSON")
         
         # Security: Validate and sanitize request body
-        is_valid, result = validate_request_json(data, allowed_fields=['lat', 'lng'])
+        is_valid, result = validate_request_json(data, allowed_fields=SCOOTER_UPDATE_FIELDS)
         if not is_valid:
             logger.warning(f"Security: Invalid request body: {result}")
             return validation_error(result)
         
-        collection = get_scooters_collection()
-        
-        # Check if scooter exists
-        scooter = collection.find_one({'id': scooter_id})
-        if not scooter:
-            return not_found_response("Scooter")
-        
         # Build update document
         update_fields = {}
         
         if 'lat' in data and 'lng' in data:
-            is_valid, result = validate_coordinates(data['lat'], data['lng'], check_us_bounds=True)
+            is_valid, result = validate_coordinates_strict(data['lat'], data['lng'])
             if not is_valid:
                 return validation_error(result)
             update_fields['lat'], update_fields['lng'] = result
+            update_fields['location'] = to_geojson_point(*result)
         
         if not update_fields:
             return validation_error("No valid fields to update")
         
-        collection.update_one({'id': scooter_id}, {'$set': update_fields})
+        collection = get_scooters_collection()
+        result = collection.update_one({'id': scooter_id}, {'$set': update_fields})
+        
+        if result.matched_count == 0:
+            return not_found_response("Scooter")
         
-        logger.info(f"Scooter {scooter_id} updated by {session.get('email')}")
+        logger.info(f"Scooter {scooter_id} updated by {g.admin_email}")
         return success_response(message=f"Scooter {scooter_id} updated successfully")
         
     except Exception as e:
@@ -4,7 +4,7 @@ Handles user registration, login, logout, and profile
 """
 import logging
 import uuid
-from datetime import datetime
+from datetime import datetime, timezone
 from flask import Blueprint, request, session
 from werkzeug.security import generate_password_hash, check_password_hash
 from pymongo import errors as mongo_errors
@@ -19,13 +19,23 @@ from utils.responses import (
     validation_error, unauthorized_response, server_error_response
 )
 from utils.auth import login_required, get_current_user, set_user_session, clear_user_session
-from config import ROLE_RENTER, ROLE_ADMIN, DEFAULT_ADMIN_EMAIL, DEFAULT_ADMIN_PASSWORD, DEFAULT_ADMIN_NAME
+from config import ROLE_RENTER, ROLE_ADMIN, DEFAULT_ADMIN_EMAIL_NORMALIZED, DEFAULT_ADMIN_PASSWORD, DEFAULT_ADMIN_NAME
 
 logger = logging.getLogger(__name__)
 
 # Create Blueprint
 auth_bp = Blueprint('auth', __name__, url_prefix='/auth')
 
+# Fields accepted in a registration body
+REGISTER_FIELDS = frozenset(('email', 'password', 'name'))
+
+# Fields login needs - skips decoding address, payment_method, etc.
+LOGIN_PROJECTION = {'_id': 0, 'id': 1, 'email': 1, 'password_hash': 1, 'role': 1, 'name': 1, 'is_active': 1}
+
+# Checked when the email is unknown, so a missing account takes as long as a wrong password
+# (otherwise response timing reveals which emails are registered)
+_DUMMY_PASSWORD_HASH = generate_password_hash('dummy-password')
+
 
 @auth_bp.route('/register', methods=['POST'])
 def register():
@@ -38,7 +48,7 @@ def register():
             return validation_error("Request body must be JSON")
         
         # Security: Validate and sanitize request body
-        is_valid, result = validate_request_json(data, allowed_fields=['email', 'password', 'name'])
+        is_valid, result = validate_request_json(data, allowed_fields=REGISTER_FIELDS)
         if not is_valid:
             logger.warning(f"Security: Invalid registration request: {result}")
             return validation_error(result)
@@ -72,12 +82,7 @@ def register():
         
         users = get_users_collection()
         
-        # Check if email already exists
-        if users.find_one({'email': email}):
-            logger.warning(f"Registration failed: Email {email} already exists")
-            return validation_error("Email already registered")
-        
-        # Create new user
+        # Create new user - the unique email index rejects duplicates (handled below)
         user_id = str(uuid.uuid4())
         new_user = {
             'id': user_id,
@@ -85,7 +90,7 @@ def register():
             'password_hash': generate_password_hash(password),
             'name': name,
             'role': ROLE_RENTER,
-            'created_at': datetime.utcnow().isoformat(),
+            'created_at': datetime.now(timezone.utc),  # Stored as a BSON date
             'is_active': True
         }
         
@@ -110,7 +115,7 @@ def register():
         }, "Registration successful")
         
     except mongo_errors.DuplicateKeyError:
-        logger.warning("Registration failed: Duplicate email")
+        logger.warning(f"Registration failed: Email {email} already exists")
         return validation_error("Email already registered")
     except Exception as e:
         logger.error(f"Registration error: {e}", exc_info=True)
@@ -134,9 +139,11 @@ def login():
             return validation_error("Email and password are required")
         
         users = get_users_collection()
-        user = users.find_one({'email': email})
+        user = users.find_one({'email': email}, LOGIN_PROJECTION)
         
-        if not user or not check_password_hash(user['password_hash'], password):
+        # Always run the hash check - skipping it for unknown emails leaks their existence via timing
+        password_ok = check_password_hash(user['password_hash'] if user else _DUMMY_PASSWORD_HASH, password)
+        if not user or not password_ok:
             logger.warning(f"Login failed for email: {email}")
             return unauthorized_response("Invalid email or password")
         
@@ -166,7 +173,7 @@ def login():
 @auth_bp.route('/logout', methods=['POST'])
 def logout():
     """Logout current user"""
-    logger.info(f"Request received: POST /auth/logout (user: {session.get('email', 'unknown')})")
+    logger.info("Request received: POST /auth/logout (user: %s)", session.get('email', 'unknown'))
     
     clear_user_session()
     return success_response(message="Logged out successfully")
@@ -176,7 +183,7 @@ def logout():
 @login_required
 def get_me():
     """Get current user information"""
-    logger.info(f"Request received: GET /auth/me (user: {session.get('email')})")
+    logger.info("Request received: GET /auth/me (user: %s)", session.get('email'))
     
     user = get_current_user()
     if not user:
@@ -190,9 +197,8 @@ def create_default_admin():
     try:
         users = get_users_collection()
         
-        # Check if any admin exists
-        admin_exists = users.find_one({'role': ROLE_ADMIN})
-        if admin_exists:
+        # Check if any admin exists (stops at the first match in the admin-only index)
+        if users.count_documents({'role': ROLE_ADMIN}, limit=1):
             logger.info("Admin user already exists")
             return
         
@@ -200,16 +206,16 @@ def create_default_admin():
         admin_id = str(uuid.uuid4())
         default_admin = {
             'id': admin_id,
-            'email': DEFAULT_ADMIN_EMAIL,
+            'email': DEFAULT_ADMIN_EMAIL_NORMALIZED,
             'password_hash': generate_password_hash(DEFAULT_ADMIN_PASSWORD),
             'name': DEFAULT_ADMIN_NAME,
             'role': ROLE_ADMIN,
-            'created_at': datetime.utcnow().isoformat(),
+            'created_at': datetime.now(timezone.utc),  # Stored as a BSON date
             'is_active': True
         }
         
         users.insert_one(default_admin)
-        logger.info(f"Default admin user created: {DEFAULT_ADMIN_EMAIL} (password: {DEFAULT_ADMIN_PASSWORD})")
+        logger.info(f"Default admin user created: {DEFAULT_ADMIN_EMAIL_NORMALIZED} (password: {DEFAULT_ADMIN_PASSWORD})")
         logger.warning("IMPORTANT: Change the default admin password in production!")
         
     except mongo_errors.DuplicateKeyError:
@@ -6,7 +6,7 @@ import logging
 from datetime import datetime, timedelta
 from flask import Blueprint, request
 
-from models.database import get_rentals_collection, get_scooters_collection, get_users_collection
+from models.database import get_rentals_collection, get_scooters_collection, find_users_by_ids
 from utils.responses import success_response, list_response, validation_error, server_error_response
 from utils.auth import admin_required
 
@@ -31,7 +31,6 @@ def get_rental_history():
     
     try:
         rentals = get_rentals_collection()
-        users = get_users_collection()
         
         # Build query
         query = {}
@@ -60,19 +59,17 @@ def get_rental_history():
         # Fetch rentals
         rental_list = list(rentals.find(query, {'_id': 0}).sort('start_time', -1))
         
-        # Enrich with user names
-        user_cache = {}
+        # Enrich with user names (one $in query for all users on the page)
+        users_by_id = find_users_by_ids(
+            (r['user_id'] for r in rental_list if r.get('user_id')),
+            {'_id': 0, 'id': 1, 'name': 1, 'email': 1}
+        )
         for rental in rental_list:
             uid = rental.get('user_id')
-            if uid and uid not in user_cache:
-                user = users.find_one({'id': uid}, {'name': 1, 'email': 1})
-                user_cache[uid] = {
-                    'name': user.get('name', 'Unknown') if user else 'Unknown',
-                    'email': user.get('email', '') if user else ''
-                }
             if uid:
-                rental['user_name'] = user_cache[uid]['name']
-                rental['user_email'] = user_cache[uid]['email']
+                user = users_by_id.get(uid, {})
+                rental['user_name'] = user.get('name', 'Unknown')
+                rental['user_email'] = user.get('email', '')
         
         logger.info(f"Retrieved {len(rental_list)} rentals")
         return list_response(rental_list)
@@ -200,7 +197,6 @@ def get_transaction_log():
     
     try:
         rentals = get_rentals_collection()
-        users = get_users_collection()
         
         days = int(request.args.get('days', 7))
         limit = min(int(request.args.get('limit', 100)), 500)  # Cap at 500
@@ -216,15 +212,15 @@ def get_transaction_log():
             {'_id': 0}
         ).sort('end_time', -1).limit(limit))
         
-        # Enrich with user info
-        user_cache = {}
+        # Enrich with user info (one $in query for all users in the log)
+        users_by_id = find_users_by_ids(
+            (r['user_id'] for r in transactions if r.get('user_id')),
+            {'_id': 0, 'id': 1, 'name': 1}
+        )
         transaction_log = []
         
         for rental in transactions:
             uid = rental.get('user_id')
-            if uid and uid not in user_cache:
-                user = users.find_one({'id': uid}, {'name': 1, 'email': 1})
-                user_cache[uid] = user.get('name', 'Unknown') if user else 'Unknown'
             
             txn = rental.get('transaction', {})
             cost = rental.get('cost', {})
@@ -234,7 +230,7 @@ def get_transaction_log():
                 'authorization_code': txn.get('authorization_code', 'N/A'),
                 'rental_id': rental.get('id'),
                 'scooter_id': rental.get('scooter_id'),
-                'user_name': user_cache.get(uid, 'Unknown'),
+                'user_name': users_by_id.get(uid, {}).get('name', 'Unknown'),
                 'amount': cost.get('total_cost', 0),
                 'unlock_fee': cost.get('unlock_fee', 0),
                 'rental_fee': cost.get('rental_fee', 0),
@@ -7,8 +7,7 @@ import json
 from datetime import datetime
 from uuid import uuid4
 from flask import Blueprint, request, session
-from geopy.distance import distance as geodesic
-from pymongo import errors as mongo_errors
+from pymongo import errors as mongo_errors, ReadPreference
 
 from models.database import get_scooters_collection, get_rentals_collection, get_users_collection
 from utils.validators import validate_coordinates, validate_radius, validate_scooter_id
@@ -18,6 +17,7 @@ from utils.responses import (
 )
 from utils.pricing import calculate_rental_cost, get_pricing_info
 from utils.payment import simulate_charge, generate_receipt
+from utils.geo import haversine_m, to_geojson_point
 from utils.auth import login_required, renter_required
 from config import ROLE_RENTER
 
@@ -41,7 +41,7 @@ def view_all_available():
         logger.info("[BREADCRUMB 3] Executing query for available scooters")
         available_scooters = list(collection.find(
             {"is_reserved": False},
-            {"_id": 0}
+            {"_id": 0, "location": 0}
         ))
         logger.info(f"[BREADCRUMB 3] Query complete - Found {len(available_scooters)} scooters")
         
@@ -65,7 +65,7 @@ def view_all_available():
 @scooters_bp.route('/search', methods=['GET'])
 def search():
     """Search for available scooters within a radius"""
-    logger.info(f"Request received: GET /search - params: {dict(request.args)}")
+    logger.info("Request received: GET /search - params: %s", dict(request.args))
     
     # Check for required parameters
     if not all(p in request.args for p in ['lat', 'lng', 'radius']):
@@ -89,30 +89,25 @@ def search():
     logger.info(f"Search parameters: lat={search_lat}, lng={search_lng}, radius={search_radius}m")
     
     try:
-        collection = get_scooters_collection()
-        all_scooters = collection.find({"is_reserved": False}, {"_id": 0})
-        
-        search_results = []
-        for scooter in all_scooters:
-            try:
-                distance = geodesic(
-                    (scooter['lat'], scooter['lng']),
-                    (search_lat, search_lng)
-                ).m
-                
-                if distance <= search_radius:
-                    search_results.append({
-                        'id': scooter['id'],
-                        'lat': scooter['lat'],
-                        'lng': scooter['lng'],
-                        'distance': round(distance, 2)
-                    })
-            except Exception as e:
-                logger.warning(f"Error calculating distance for scooter {scooter.get('id')}: {e}")
-                continue
-        
-        # Sort by distance
-        search_results.sort(key=lambda x: x['distance'])
+        # Scooter locations are eventually consistent - let a secondary serve the search
+        collection = get_scooters_collection().with_options(
+            read_preference=ReadPreference.SECONDARY_PREFERRED
+        )
+        
+        # 2dsphere index does the radius filter and returns results sorted by distance
+        search_results = list(collection.aggregate([
+            {"$geoNear": {
+                "near": to_geojson_point(search_lat, search_lng),
+                "distanceField": "distance",
+                "maxDistance": search_radius,
+                "query": {"is_reserved": False},
+                "spherical": True
+            }},
+            {"$project": {"_id": 0, "id": 1, "lat": 1, "lng": 1, "distance": 1}}
+        ]))
+        
+        for scooter in search_results:
+            scooter['distance'] = round(scooter['distance'], 2)
         
         logger.info(f"Search completed: Found {len(search_results)} scooters within {search_radius}m")
         return list_response(search_results)
@@ -129,7 +124,7 @@ def search():
 @renter_required
 def start_reservation():
     """Start a reservation for a scooter (renter only)"""
-    logger.info(f"Request received: {request.method} /reservation/start - params: {dict(request.args)}")
+    logger.info("Request received: %s /reservation/start - params: %s", request.method, dict(request.args))
     
     user_id = session.get('user_id')
     user_email = session.get('email')
@@ -228,7 +223,7 @@ def start_reservation():
 @renter_required
 def end_reservation():
     """End a reservation, calculate charges, and update scooter location (renter only)"""
-    logger.info(f"Request received: {request.method} /reservation/end - params: {dict(request.args)}")
+    logger.info("Request received: %s /reservation/end - params: %s", request.method, dict(request.args))
     
     user_id = session.get('user_id')
     user_email = session.get('email')
@@ -292,10 +287,10 @@ def end_reservation():
         
         # Calculate distance traveled
         start_location = rental.get('start_location', {'lat': scooter['lat'], 'lng': scooter['lng']}) if rental else {'lat': scooter['lat'], 'lng': scooter['lng']}
-        distance_traveled = geodesic(
-            (start_location['lat'], start_location['lng']),
-            (end_lat, end_lng)
-        ).m
+        distance_traveled = haversine_m(
+            start_location['lat'], start_location['lng'],
+            end_lat, end_lng
+        )
         
         logger.info(f"Rental cost for scooter {scooter_id}: ${cost_breakdown['total_cost']:.2f} ({cost_breakdown['pricing_tier']})")
         
@@ -353,7 +348,8 @@ def end_reservation():
             {"$set": {
                 "is_reserved": False,
                 "lat": end_lat,
-                "lng": end_lng
+                "lng": end_lng,
+                "location": to_geojson_point(end_lat, end_lng)
             },
             "$unset": {
                 "current_rental_id": "",
@@ -422,7 +418,7 @@ def get_rental_history():
     user_id = session.get('user_id')
     user_email = session.get('email')
     
-    logger.info(f"Request received: GET /rentals/history for user {user_email}")
+    logger.info("Request received: GET /rentals/history for user %s", user_email)
     
     try:
         rentals = get_rentals_collection()
@@ -469,7 +465,7 @@ def get_active_rental():
     user_id = session.get('user_id')
     user_email = session.get('email')
     
-    logger.info(f"Request received: GET /rentals/active for user {user_email}")
+    logger.info("Request received: GET /rentals/active for user %s", user_email)
     
     try:
         rentals = get_rentals_collection()
@@ -10,6 +10,36 @@ async function loadAdminData() {
     await loadFleet();
 }
 
+// Largest page the admin list endpoints serve (ADMIN_PAGE_SIZE_MAX) - fewer round trips per load
+const ADMIN_PAGE_SIZE = 1000;
+
+/**
+ * Fetch every page of a paginated admin list endpoint.
+ * Returns the first page's result with `key` holding the items from all pages.
+ */
+async function apiGetAllPages(endpoint, key) {
+    let firstResult = null;
+    const items = [];
+    let afterId = null;
+    
+    do {
+        let url = `${endpoint}?limit=${ADMIN_PAGE_SIZE}`;
+        if (afterId) {
+            url += `&after_id=${encodeURIComponent(afterId)}`;
+        }
+        const result = await apiGet(url);
+        if (!result.ok) {
+            return result;
+        }
+        firstResult = firstResult || result;
+        items.push(...result.data[key]);
+        afterId = result.data.next_after_id;
+    } while (afterId);
+    
+    firstResult.data[key] = items;
+    return firstResult;
+}
+
 /**
  * Load users list
  */
@@ -17,7 +47,7 @@ async function loadUsers() {
     const listDiv = document.getElementById('usersList');
     listDiv.innerHTML = '<div class="loading-text">Loading users...</div>';
     
-    const result = await apiGet('/admin/users');
+    const result = await apiGetAllPages('/admin/users', 'users');
     
     if (result.ok) {
         displayUsers(result.data.users);
@@ -79,7 +109,7 @@ async function loadFleet() {
     const listDiv = document.getElementById('fleetList');
     listDiv.innerHTML = '<div class="loading-text">Loading fleet...</div>';
     
-    const result = await apiGet('/admin/scooters');
+    const result = await apiGetAllPages('/admin/scooters', 'scooters');
     
     if (result.ok) {
         displayFleetStats(result.data.stats);
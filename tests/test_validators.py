@@ -3,8 +3,10 @@ Test Suite for Validators and Security
 Run with: python -m pytest tests/ -v
 Or run directly: python tests/test_validators.py
 """
+import json
 import sys
 import os
+import time
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -17,11 +19,16 @@ from utils.validators import (
     validate_email,
     validate_password,
     validate_required_fields,
+    has_required_fields,
     validate_request_json,
     sanitize_string,
     sanitize_input,
-    get_coordinate_suggestions
+    get_coordinate_suggestions,
+    validate_page_limit,
+    XSS_REGEX
 )
+from utils.responses import success_response
+from utils.pricing import get_pricing_info
 
 
 class Colors:
@@ -169,7 +176,21 @@ def test_coordinates():
     is_valid, result = validate_coordinates(30.26720000001, -97.74310000001)
     if run_test("Coordinates rounded to 6 decimal places", is_valid and result == (30.2672, -97.7431)):
         passed += 1
+
+    # Test 19: Cached string inputs still honor the US bounds flag
+    total += 1
+    first_valid, _ = validate_coordinates("51.5074", "-0.1278")
+    second_valid, result = validate_coordinates("51.5074", "-0.1278", check_us_bounds=True)
+    if run_test("Repeated string coordinates respect check_us_bounds", first_valid and not second_valid and "outside US" in result):
+        passed += 1
     
+    # Test 20: Strict validation enforces US bounds for strings and numbers
+    total += 1
+    austin_valid, austin = validate_coordinates_strict("30.2672", "-97.7431")
+    london_valid, _ = validate_coordinates_strict(51.5074, -0.1278)
+    if run_test("Strict validation enforces US bounds", austin_valid and austin == (30.2672, -97.7431) and not london_valid):
+        passed += 1
+
     print(f"\n  {Colors.BOLD}Coordinate Tests: {passed}/{total} passed{Colors.RESET}")
     return passed, total
 
@@ -267,6 +288,59 @@ def test_security():
     if run_test("Allow None value", is_safe and result is None):
         passed += 1
     
+    # Test 15: Operator reason wins even when an XSS pattern comes first
+    total += 1
+    is_safe, result = sanitize_string("<script>$where", "test")
+    if run_test("Report $ operator ahead of earlier XSS", not is_safe and "$ operator" in result):
+        passed += 1
+    
+    # Test 16: Array-of-objects pattern (only '[' and '{' are suspicious)
+    total += 1
+    is_safe, result = sanitize_string("[ {}]", "test")
+    if run_test("Block array-of-objects pattern", not is_safe):
+        passed += 1
+    
+    # Test 17: Nested error names the full field path
+    total += 1
+    is_safe, result = sanitize_input({"items": [{"name": "ok"}, {"name": "<script>"}]}, "data")
+    if run_test("Report nested field path", not is_safe and result.startswith("data.items[1].name ")):
+        passed += 1
+    
+    # Test 18: Cached scan result still reports the caller's field name
+    total += 1
+    sanitize_string("<script>", "first")
+    is_safe, result = sanitize_string("<script>", "second")
+    if run_test("Cached scan uses current field name", not is_safe and result.startswith("second ")):
+        passed += 1
+    
+    # Test 19: Overly long string is rejected without scanning
+    total += 1
+    is_safe, result = sanitize_string("a" * 5000, "test")
+    if run_test("Reject overly long string", not is_safe and "too long" in result):
+        passed += 1
+    
+    # Test 20: Event handler pattern matches attributes but not words ending in "on"
+    total += 1
+    blocked, _ = sanitize_string("<b onmouseover = alert(1)>", "test")
+    allowed, _ = sanitize_string("button=1", "test")
+    if run_test("Block on...= handler, allow button=1", not blocked and allowed):
+        passed += 1
+    
+    # Test 21: Event handler pattern stays linear on repeated "on" (was quadratic)
+    total += 1
+    start = time.perf_counter()
+    XSS_REGEX.search("on" * 5000)
+    elapsed = time.perf_counter() - start
+    if run_test("Scan 'onon...' quickly (no quadratic backtracking)", elapsed < 0.05):
+        passed += 1
+
+    # Test 22: "$" operator check stays ASCII-only ("ſ" and the Kelvin sign case-fold to s/k)
+    total += 1
+    long_s_safe, _ = sanitize_string("1@b$ſ", "test")
+    kelvin_safe, _ = sanitize_string("5K$K", "test")
+    if run_test("Allow $ followed by non-ASCII letters", long_s_safe and kelvin_safe):
+        passed += 1
+
     print(f"\n  {Colors.BOLD}Security Tests: {passed}/{total} passed{Colors.RESET}")
     return passed, total
 
@@ -519,6 +593,20 @@ def test_request_json():
     if run_test("Reject list body (must be object)", not is_valid and "object" in result.lower()):
         passed += 1
     
+    # Test 8: Required fields all present
+    total += 1
+    is_valid, missing = validate_required_fields({"id": "SCO1", "lat": 30.2, "lng": -97.7}, ['id', 'lat', 'lng'])
+    if run_test("Accept body with all required fields", is_valid and missing == [] and
+                has_required_fields({"id": "SCO1", "lat": 30.2, "lng": -97.7}, ['id', 'lat', 'lng'])):
+        passed += 1
+    
+    # Test 9: Missing and empty required fields are all reported
+    total += 1
+    is_valid, missing = validate_required_fields({"id": "", "lat": 30.2}, ['id', 'lat', 'lng'])
+    if run_test("Report missing/empty required fields", not is_valid and missing == ['id', 'lng'] and
+                not has_required_fields({"id": "", "lat": 30.2}, ['id', 'lat', 'lng'])):
+        passed += 1
+    
     print(f"\n  {Colors.BOLD}Request JSON Tests: {passed}/{total} passed{Colors.RESET}")
     return passed, total
 
@@ -568,10 +656,89 @@ def test_radius():
     if run_test("Reject non-numeric radius", not is_valid):
         passed += 1
     
+    # Test 7: NaN radius (would reach $geoNear maxDistance)
+    total += 1
+    nan_valid, _ = validate_radius("nan")
+    inf_valid, _ = validate_radius(float('inf'))
+    if run_test("Reject NaN and infinite radius", not nan_valid and not inf_valid):
+        passed += 1
+    
     print(f"\n  {Colors.BOLD}Radius Tests: {passed}/{total} passed{Colors.RESET}")
     return passed, total
 
 
+# ===========================================
+# PAGINATION TESTS
+# ===========================================
+
+def test_page_limit():
+    print_header("PAGINATION LIMIT TESTS")
+    passed = 0
+    total = 0
+    
+    # Test 1: Missing limit uses default
+    total += 1
+    is_valid, result = validate_page_limit(None)
+    if run_test("Missing limit uses default (200)", is_valid and result == 200):
+        passed += 1
+    
+    # Test 2: Valid string limit
+    total += 1
+    is_valid, result = validate_page_limit("50")
+    if run_test("Accept limit 50", is_valid and result == 50):
+        passed += 1
+    
+    # Test 3: Over maximum
+    total += 1
+    is_valid, result = validate_page_limit("5000")
+    if run_test("Reject limit above max", not is_valid and "at most" in result):
+        passed += 1
+    
+    # Test 4: Zero / non-numeric
+    total += 1
+    zero_valid, _ = validate_page_limit("0")
+    text_valid, _ = validate_page_limit("ten")
+    if run_test("Reject zero and non-numeric limits", not zero_valid and not text_valid):
+        passed += 1
+    
+    print(f"\n  {Colors.BOLD}Pagination Tests: {passed}/{total} passed{Colors.RESET}")
+    return passed, total
+
+
+# ===========================================
+# RESPONSE SERIALIZATION TESTS
+# ===========================================
+
+def test_responses():
+    print_header("RESPONSE SERIALIZATION TESTS")
+    passed = 0
+    total = 0
+    
+    # Test 1: Pricing info (int-keyed multi-day rates) serializes
+    total += 1
+    try:
+        body, status, _ = success_response({'pricing': get_pricing_info()})
+        pricing = json.loads(body)['pricing']
+        ok = status == 200 and all(isinstance(k, str) for k in pricing['multiday_rates'])
+    except TypeError:
+        ok = False
+    if run_test("Serialize pricing with int-keyed rates", ok):
+        passed += 1
+    
+    # Test 2: Non-string keys are written as strings
+    total += 1
+    try:
+        body, _, _ = success_response({'rates': {2: 1.5}})
+        ok = json.loads(body) == {'rates': {'2': 1.5}}
+    except TypeError:
+        ok = False
+    if run_test("Int dict keys become string keys", ok):
+        passed += 1
+    
+    print(f"\n  {Colors.BOLD}Response Tests: {passed}/{total} passed{Colors.RESET}")
+    return passed, total
+
+
 # ===========================================
 # COORDINATE SUGGESTIONS TESTS
 # ===========================================
@@ -656,6 +823,14 @@ def run_all_tests():
     total_passed += p
     total_tests += t
     
+    p, t = test_page_limit()
+    total_passed += p
+    total_tests += t
+    
+    p, t = test_responses()
+    total_passed += p
+    total_tests += t
+    
     p, t = test_suggestions()
     total_passed += p
     total_tests += t
@@ -8,7 +8,8 @@ from utils.validators import (
     validate_scooter_id,
     validate_email,
     validate_password,
-    validate_required_fields
+    validate_required_fields,
+    has_required_fields
 )
 from utils.auth import (
     login_required,
@@ -29,7 +30,7 @@ from utils.responses import (
 __all__ = [
     # Validators
     'validate_coordinates', 'validate_radius', 'validate_scooter_id',
-    'validate_email', 'validate_password', 'validate_required_fields',
+    'validate_email', 'validate_password', 'validate_required_fields', 'has_required_fields',
     # Auth
     'login_required', 'admin_required', 'get_current_user', 'get_current_user_id', 'is_admin',
     # Responses
@@ -0,0 +1,33 @@
+"""
+Geo Utility Module
+Great-circle distance helpers for ride distances and proximity search
+"""
+from math import radians, sin, cos, asin, sqrt
+
+# Mean Earth radius in meters
+EARTH_RADIUS_M = 6371000.0
+
+
+def haversine_m(lat1, lng1, lat2, lng2):
+    """
+    Calculate the great-circle distance in meters between two points.
+
+    Uses the haversine formula on a spherical Earth - within ~0.5% of the
+    ellipsoidal geodesic, which is plenty for ride distances and search radii.
+    """
+    lat1_r = radians(lat1)
+    lat2_r = radians(lat2)
+    # Each trig term is computed once and squared by multiplication (cheaper than **2)
+    sin_dlat = sin((lat2_r - lat1_r) * 0.5)
+    sin_dlng = sin(radians(lng2 - lng1) * 0.5)
+
+    a = sin_dlat * sin_dlat + cos(lat1_r) * cos(lat2_r) * sin_dlng * sin_dlng
+    return 2 * EARTH_RADIUS_M * asin(sqrt(a))
+
+
+def to_geojson_point(lat, lng):
+    """
+    Build a GeoJSON Point for MongoDB's 2dsphere index.
+    Note GeoJSON orders coordinates as [lng, lat].
+    """
+    return {'type': 'Point', 'coordinates': [lng, lat]}
@@ -2,15 +2,26 @@
 Response Helpers
 Standardized JSON response functions for API consistency
 """
-import json
 import logging
 
+import orjson
+
 logger = logging.getLogger(__name__)
 
 # Content type header for JSON responses
 JSON_HEADERS = {'Content-Type': 'application/json'}
 
 
+def _dumps(obj):
+    """
+    Encode a response body to compact UTF-8 JSON bytes.
+    orjson is several times faster than stdlib json and encodes datetimes natively;
+    naive datetimes (how PyMongo returns BSON dates) are marked as UTC, and non-string
+    dict keys (e.g. the int-keyed multi-day rates) become strings like stdlib json does.
+    """
+    return orjson.dumps(obj, option=orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS)
+
+
 def success_response(data=None, message=None, status_code=200):
     """
     Create a successful JSON response
@@ -24,7 +35,7 @@ def success_response(data=None, message=None, status_code=200):
         else:
             response['data'] = data
     
-    return json.dumps(response), status_code, JSON_HEADERS
+    return _dumps(response), status_code, JSON_HEADERS
 
 
 def error_response(message, status_code=400, error_type=None):
@@ -35,7 +46,7 @@ def error_response(message, status_code=400, error_type=None):
     if error_type:
         response['error_type'] = error_type
     
-    return json.dumps(response), status_code, JSON_HEADERS
+    return _dumps(response), status_code, JSON_HEADERS
 
 
 def list_response(items, count=None, status_code=200):
@@ -45,7 +56,7 @@ def list_response(items, count=None, status_code=200):
     if count is None:
         count = len(items) if items else 0
     
-    return json.dumps(items), status_code, JSON_HEADERS
+    return _dumps(items), status_code, JSON_HEADERS
 
 
 def created_response(data=None, message="Created successfully"):
@@ -5,7 +5,12 @@ Includes security sanitization to prevent NoSQL injection and XSS attacks
 """
 import math
 import re
-from config import MAX_SEARCH_RADIUS, MAX_SCOOTER_ID_LENGTH, MIN_PASSWORD_LENGTH
+import string
+from functools import lru_cache
+from config import (
+    MAX_SEARCH_RADIUS, MAX_SCOOTER_ID_LENGTH, MIN_PASSWORD_LENGTH, MAX_STRING_LENGTH,
+    ADMIN_PAGE_SIZE_DEFAULT, ADMIN_PAGE_SIZE_MAX
+)
 
 # ===========================================
 # SECURITY: Patterns to detect malicious input
@@ -28,7 +33,9 @@ INJECTION_PATTERNS = [
 XSS_PATTERNS = [
     r'<script',
     r'javascript:',
-    r'on\w+\s*=',         # onclick=, onerror=, etc.
+    # onclick=, onerror=, etc. - same matches as on\w+\s*=, but only tried at the start of a
+    # word so each word is scanned once (the naive form is quadratic on "onon...")
+    r'(?<!\w)(?=\w*on\w)\w+\s*=',
     r'<iframe',
     r'<object',
     r'<embed',
@@ -38,6 +45,34 @@ XSS_PATTERNS = [
 INJECTION_REGEX = re.compile('|'.join(INJECTION_PATTERNS), re.IGNORECASE)
 XSS_REGEX = re.compile('|'.join(XSS_PATTERNS), re.IGNORECASE)
 
+# All three pattern sets in one alternation - clean input (the common case) is scanned once, not three times.
+# Case-insensitivity is scoped to the injection/xss groups: MONGODB_OPERATORS is case-sensitive, and a global
+# IGNORECASE would let [a-zA-Z] also match 'ſ' and the Kelvin sign via Unicode case folding
+SANITIZE_REGEX = re.compile(
+    f"(?P<mongo>{MONGODB_OPERATORS.pattern})"
+    f"|(?i:(?P<injection>{INJECTION_REGEX.pattern})"
+    f"|(?P<xss>{XSS_REGEX.pattern}))"
+)
+
+# Allowed scooter ID characters: letters, numbers, dashes, and underscores
+# (a set membership test - no regex engine needed for a plain charset check)
+SCOOTER_ID_CHARS = frozenset(string.ascii_letters + string.digits + '_-')
+
+# Email address format (compiled once - validate_email runs on every login and registration)
+EMAIL_REGEX = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
+# Max cached results per validator for repeated query-string inputs (bounds memory)
+VALIDATION_CACHE_SIZE = 4096
+
+# Only strings up to this length have their sanitizer scan memoized (keeps cache memory bounded)
+SANITIZE_CACHE_MAX_LENGTH = 256
+
+# Shared result for "nothing to sanitize" - avoids building a new tuple per None value
+_OK_NONE = (True, None)
+
+# Stands in for the value of a $-prefixed key while sanitize_input walks a body
+_INVALID_KEY = object()
+
 
 def sanitize_string(value, field_name="input"):
     """
@@ -45,29 +80,74 @@ def sanitize_string(value, field_name="input"):
     Returns: (is_safe: bool, sanitized_value: str or error_message: str)
     """
     if value is None:
-        return True, None
+        return _OK_NONE
     
-    # Must be a string (not dict, list, etc.)
-    if not isinstance(value, str):
+    # Must be a string (not dict, list, etc.) - exact type test first, JSON strings are never subclasses
+    if type(value) is not str:
         # If it's a dict or list, it could be an injection attempt
         if isinstance(value, (dict, list)):
             return False, f"{field_name} contains invalid data structure (possible injection attempt)"
         # Try to convert to string
         value = str(value)
     
-    # Check for MongoDB operator injection
-    if MONGODB_OPERATORS.search(value):
+    reason = _check_string(value)
+    if reason is None:
+        return True, value
+    
+    if reason == 'too_long':
+        return False, f"{field_name} is too long (max {MAX_STRING_LENGTH} characters)"
+    
+    if reason == 'mongo':
         return False, f"{field_name} contains invalid characters ($ operator not allowed)"
     
-    # Check for common injection patterns
-    if INJECTION_REGEX.search(value):
+    if reason == 'injection':
         return False, f"{field_name} contains potentially malicious content"
     
-    # Check for XSS patterns
-    if XSS_REGEX.search(value):
-        return False, f"{field_name} contains invalid HTML/script content"
+    return False, f"{field_name} contains invalid HTML/script content"
+
+
+def _check_string(value):
+    """
+    Check a string for malicious patterns
+    Returns: 'too_long', or 'mongo', 'injection' or 'xss' for the first matching pattern set, or None if clean
+    """
+    # Cap the work per value - no legitimate field comes close, and it bounds worst-case scan time
+    if len(value) > MAX_STRING_LENGTH:
+        return 'too_long'
+    
+    # Fast path: every pattern above needs a literal $, [, <, : or = - typical names,
+    # emails and IDs contain none, so skip the regex engine entirely
+    if not ('$' in value or '[' in value or '<' in value or ':' in value or '=' in value):
+        return None
+    
+    # Short values repeat a lot across requests (IDs, flags, emails) - memoize their scan result
+    if len(value) <= SANITIZE_CACHE_MAX_LENGTH:
+        return _scan_string_cached(value)
+    return _scan_string(value)
+
+
+@lru_cache(maxsize=VALIDATION_CACHE_SIZE)
+def _scan_string_cached(value):
+    """Memoized _scan_string for short strings"""
+    return _scan_string(value)
+
+
+def _scan_string(value):
+    """Regex scan behind _check_string"""
+    # Single pass over the value for MongoDB operators, injection patterns and XSS
+    match = SANITIZE_REGEX.search(value)
+    if match is None:
+        return None
+    
+    # The combined scan reports the leftmost hit; keep the reason precedence
+    # (operator > injection > XSS) independent of where each pattern occurs
+    if match.lastgroup == 'mongo' or MONGODB_OPERATORS.search(value):
+        return 'mongo'
+    
+    if match.lastgroup == 'injection' or INJECTION_REGEX.search(value):
+        return 'injection'
     
-    return True, value
+    return 'xss'
 
 
 def sanitize_input(data, field_name="input"):
@@ -75,42 +155,74 @@ def sanitize_input(data, field_name="input"):
     Sanitize any input (handles strings, dicts, lists)
     For dicts/lists from JSON body, ensures no MongoDB operators are present
     """
+    if not isinstance(data, (dict, list)):
+        return _sanitize_scalar(data, field_name)
+    
+    # Walk nested dicts/lists with an explicit stack instead of recursing per node.
+    # Paths are (parent_path, key, is_index) links, only formatted when reporting an error.
+    stack = [(data, field_name)]
+    while stack:
+        value, path = stack.pop()
+        
+        # Leaves are checked by exact type (one pointer compare each, JSON values are never
+        # subclasses) and without building (is_safe, result) tuples
+        value_type = type(value)
+        if value_type is str:
+            if _check_string(value) is None:
+                continue
+        elif (value is None or value_type is int or value_type is bool
+                or (value_type is float and math.isfinite(value))):
+            continue
+        elif isinstance(value, dict):
+            # Pushed in reverse so entries are checked in document order
+            for key, item in reversed(value.items()):
+                # Keys should not contain $ (MongoDB operators) - reported when this entry comes up
+                if type(key) is str and key[:1] == '$':
+                    item = _INVALID_KEY
+                stack.append((item, (path, key, False)))
+            continue
+        elif isinstance(value, list):
+            for i in range(len(value) - 1, -1, -1):
+                stack.append((value[i], (path, i, True)))
+            continue
+        elif value is _INVALID_KEY:
+            return False, f"Invalid field name in {_format_field_path(path[0])} ($ prefix not allowed)"
+        
+        # Unsafe or unusual value - the full check builds the message with the real path
+        is_safe, result = _sanitize_scalar(value, _format_field_path(path))
+        if not is_safe:
+            return False, result
+    
+    return True, data
+
+
+def _sanitize_scalar(data, field_name):
+    """Sanitize a single non-container value"""
     if data is None:
-        return True, None
+        return _OK_NONE
     
     if isinstance(data, str):
         return sanitize_string(data, field_name)
     
     if isinstance(data, (int, float)):
         # Numbers are safe, but check for special values
-        if isinstance(data, float) and (math.isnan(data) or math.isinf(data)):
+        if isinstance(data, float) and not math.isfinite(data):
             return False, f"{field_name} contains invalid number (NaN or Infinity)"
         return True, data
     
-    if isinstance(data, dict):
-        # Check all keys and values in dict
-        for key, value in data.items():
-            # Keys should not contain $ (MongoDB operators)
-            if isinstance(key, str) and key.startswith('$'):
-                return False, f"Invalid field name in {field_name} ($ prefix not allowed)"
-            
-            # Recursively check values
-            is_safe, result = sanitize_input(value, f"{field_name}.{key}")
-            if not is_safe:
-                return False, result
-        return True, data
-    
-    if isinstance(data, list):
-        # Check all items in list
-        for i, item in enumerate(data):
-            is_safe, result = sanitize_input(item, f"{field_name}[{i}]")
-            if not is_safe:
-                return False, result
-        return True, data
-    
     # For other types, convert to string and check
     return sanitize_string(str(data), field_name)
 
+
+def _format_field_path(path):
+    """Format a sanitize_input path link as e.g. 'request body.items[0].name'"""
+    parts = []
+    while type(path) is tuple:
+        path, key, is_index = path
+        parts.append(f"[{key}]" if is_index else f".{key}")
+    parts.append(path)
+    return ''.join(reversed(parts))
+
 # US Geographic Bounds (Continental US + some buffer for border areas)
 US_BOUNDS = {
     'lat_min': 24.396308,   # Southern tip of Florida Keys
@@ -119,6 +231,12 @@ US_BOUNDS = {
     'lng_max': -66.93457    # East coast (Maine)
 }
 
+# Continental US bounds as plain constants - avoids four dict lookups per bounds check
+_CUS_LAT_MIN = US_BOUNDS['lat_min']
+_CUS_LAT_MAX = US_BOUNDS['lat_max']
+_CUS_LNG_MIN = US_BOUNDS['lng_min']
+_CUS_LNG_MAX = US_BOUNDS['lng_max']
+
 # Extended bounds including Alaska, Hawaii, Puerto Rico
 EXTENDED_US_BOUNDS = {
     'lat_min': 17.5,        # Puerto Rico / US Virgin Islands
@@ -140,6 +258,20 @@ def validate_coordinates(lat, lng, check_us_bounds=False, allow_null_island=Fals
     
     Returns: (is_valid: bool, result: tuple(lat, lng) or error_message: str)
     """
+    # Query-string inputs repeat a lot (e.g. clients polling from the same spot) - memoize them
+    if type(lat) is str and type(lng) is str:
+        return _validate_coordinates_cached(lat, lng, check_us_bounds, allow_null_island)
+    return _validate_coordinates(lat, lng, check_us_bounds, allow_null_island)
+
+
+@lru_cache(maxsize=VALIDATION_CACHE_SIZE)
+def _validate_coordinates_cached(lat, lng, check_us_bounds, allow_null_island):
+    """Memoized validate_coordinates for string inputs"""
+    return _validate_coordinates(lat, lng, check_us_bounds, allow_null_island)
+
+
+def _validate_coordinates(lat, lng, check_us_bounds, allow_null_island):
+    """Coordinate validation body shared by the cached and uncached paths"""
     # Check for None/empty values
     if lat is None or lng is None:
         return False, "Latitude and longitude are required"
@@ -147,25 +279,27 @@ def validate_coordinates(lat, lng, check_us_bounds=False, allow_null_island=Fals
     if lat == '' or lng == '':
         return False, "Latitude and longitude cannot be empty"
     
-    # Try to convert to float
+    # Convert to float - floats from JSON bodies are used as-is
     try:
-        lat = float(lat)
-        lng = float(lng)
+        if type(lat) is not float:
+            lat = float(lat)
+        if type(lng) is not float:
+            lng = float(lng)
     except (ValueError, TypeError):
         return False, "Coordinates must be valid numbers (e.g., 30.2672, -97.7431)"
     
-    # Check for NaN or Infinity
-    if math.isnan(lat) or math.isnan(lng):
-        return False, "Coordinates cannot be NaN (Not a Number)"
-    
-    if math.isinf(lat) or math.isinf(lng):
+    # Check for NaN or Infinity - one isfinite() call per value on the valid path,
+    # telling the two apart only when the check fails
+    if not (math.isfinite(lat) and math.isfinite(lng)):
+        if math.isnan(lat) or math.isnan(lng):
+            return False, "Coordinates cannot be NaN (Not a Number)"
         return False, "Coordinates cannot be infinite"
     
     # Basic range validation
-    if not (-90 <= lat <= 90):
+    if not -90.0 <= lat <= 90.0:
         return False, f"Latitude must be between -90 and 90 degrees (got {lat})"
     
-    if not (-180 <= lng <= 180):
+    if not -180.0 <= lng <= 180.0:
         return False, f"Longitude must be between -180 and 180 degrees (got {lng})"
     
     # Check for Null Island (0, 0) - common data entry error
@@ -191,8 +325,7 @@ def _check_us_bounds(lat, lng):
     Returns: (is_valid: bool, error_message: str or None)
     """
     # Check Continental US first
-    if (US_BOUNDS['lat_min'] <= lat <= US_BOUNDS['lat_max'] and 
-        US_BOUNDS['lng_min'] <= lng <= US_BOUNDS['lng_max']):
+    if _CUS_LAT_MIN <= lat <= _CUS_LAT_MAX and _CUS_LNG_MIN <= lng <= _CUS_LNG_MAX:
         return True, None
     
     # Check Hawaii (roughly)
@@ -219,7 +352,10 @@ def validate_coordinates_strict(lat, lng):
     """
     Strict coordinate validation for scooter placement (US bounds enforced)
     """
-    return validate_coordinates(lat, lng, check_us_bounds=True, allow_null_island=False)
+    # Same dispatch as validate_coordinates with the flags fixed - one call frame, no keyword arguments
+    if type(lat) is str and type(lng) is str:
+        return _validate_coordinates_cached(lat, lng, True, False)
+    return _validate_coordinates(lat, lng, True, False)
 
 
 def get_coordinate_suggestions(lat, lng):
@@ -258,11 +394,28 @@ def validate_radius(radius):
     Validate search radius
     Returns: (is_valid: bool, result: float or error_message: str)
     """
+    if type(radius) is str:
+        return _validate_radius_cached(radius)
+    return _validate_radius(radius)
+
+
+@lru_cache(maxsize=VALIDATION_CACHE_SIZE)
+def _validate_radius_cached(radius):
+    """Memoized validate_radius for string inputs"""
+    return _validate_radius(radius)
+
+
+def _validate_radius(radius):
+    """Radius validation body shared by the cached and uncached paths"""
     try:
         radius = float(radius)
     except (ValueError, TypeError):
         return False, "Radius must be a valid number"
     
+    # NaN slips past both range checks below (every comparison is False)
+    if not math.isfinite(radius):
+        return False, "Radius must be a finite number"
+    
     if radius <= 0:
         return False, "Radius must be greater than 0"
     
@@ -272,16 +425,58 @@ def validate_radius(radius):
     return True, radius
 
 
+def validate_page_limit(limit, default=ADMIN_PAGE_SIZE_DEFAULT, maximum=ADMIN_PAGE_SIZE_MAX):
+    """
+    Validate a pagination page size (missing means the default)
+    Returns: (is_valid: bool, result: int or error_message: str)
+    """
+    if limit is None or limit == '':
+        return True, default
+    
+    try:
+        limit = int(limit)
+    except (ValueError, TypeError):
+        return False, "Limit must be a whole number"
+    
+    if limit <= 0:
+        return False, "Limit must be greater than 0"
+    
+    if limit > maximum:
+        return False, f"Limit must be at most {maximum}"
+    
+    return True, limit
+
+
 def validate_scooter_id(scooter_id):
     """
     Validate and sanitize scooter ID
     Returns: (is_valid: bool, result: str or error_message: str)
     """
+    # Only plain strings are cached - dicts/lists are unhashable and rejected below anyway
+    if type(scooter_id) is str:
+        return _validate_scooter_id_cached(scooter_id)
+    return _validate_scooter_id(scooter_id)
+
+
+@lru_cache(maxsize=VALIDATION_CACHE_SIZE)
+def _validate_scooter_id_cached(scooter_id):
+    """Memoized validate_scooter_id for string inputs"""
+    return _validate_scooter_id(scooter_id)
+
+
+def _validate_scooter_id(scooter_id):
+    """Scooter ID validation body shared by the cached and uncached paths"""
+    # Fast path: an already-clean string needs no normalization, and the injection
+    # scan cannot match anything made only of letters, digits, dashes and underscores
+    if (type(scooter_id) is str and 0 < len(scooter_id) <= MAX_SCOOTER_ID_LENGTH
+            and SCOOTER_ID_CHARS.issuperset(scooter_id)):
+        return True, scooter_id
+    
     if not scooter_id:
         return False, "Scooter ID cannot be empty"
     
     # Security: Must be a simple string, not a dict/list (injection prevention)
-    if isinstance(scooter_id, (dict, list)):
+    if type(scooter_id) is not str and isinstance(scooter_id, (dict, list)):
         return False, "Invalid scooter ID format (possible injection attempt)"
     
     # Convert to string and strip whitespace
@@ -299,7 +494,7 @@ def validate_scooter_id(scooter_id):
         return False, result
     
     # Only allow alphanumeric, dashes, and underscores
-    if not re.match(r'^[a-zA-Z0-9_-]+$', scooter_id):
+    if not SCOOTER_ID_CHARS.issuperset(scooter_id):
         return False, "Scooter ID can only contain letters, numbers, dashes, and underscores"
     
     return True, scooter_id
@@ -313,8 +508,8 @@ def validate_email(email):
     if not email:
         return False, "Email cannot be empty"
     
-    # Security: Must be a string
-    if isinstance(email, (dict, list)):
+    # Security: Must be a string (plain strings skip the isinstance check)
+    if type(email) is not str and isinstance(email, (dict, list)):
         return False, "Invalid email format (possible injection attempt)"
     
     email = str(email).strip().lower()
@@ -329,8 +524,7 @@ def validate_email(email):
         return False, "Invalid email format"
     
     # More strict email validation
-    email_pattern = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
-    if not email_pattern.match(email):
+    if not EMAIL_REGEX.match(email):
         return False, "Invalid email format"
     
     # Check length
@@ -348,8 +542,8 @@ def validate_password(password):
     if not password:
         return False, "Password cannot be empty"
     
-    # Security: Must be a string
-    if isinstance(password, (dict, list)):
+    # Security: Must be a string (plain strings skip the isinstance check)
+    if type(password) is not str and isinstance(password, (dict, list)):
         return False, "Invalid password format"
     
     password = str(password)
@@ -369,7 +563,8 @@ def validate_request_json(data, allowed_fields=None):
     
     Args:
         data: The parsed JSON data (dict)
-        allowed_fields: Optional list of allowed field names
+        allowed_fields: Optional collection of allowed field names (pass a frozenset
+                        built once at module level for O(1) membership checks)
     
     Returns: (is_valid: bool, sanitized_data: dict or error_message: str)
     """
@@ -379,16 +574,16 @@ def validate_request_json(data, allowed_fields=None):
     if not isinstance(data, dict):
         return False, "Request body must be a JSON object"
     
-    # Check for MongoDB operators in keys
-    for key in data.keys():
-        if isinstance(key, str) and key.startswith('$'):
+    # One pass over the keys: reject MongoDB operators and collect unknown fields
+    unknown_fields = []
+    for key in data:
+        if type(key) is str and key[:1] == '$':
             return False, f"Invalid field name: {key} ($ prefix not allowed)"
+        if allowed_fields and key not in allowed_fields:
+            unknown_fields.append(key)
     
-    # If allowed_fields specified, check for unknown fields
-    if allowed_fields:
-        unknown_fields = set(data.keys()) - set(allowed_fields)
-        if unknown_fields:
-            return False, f"Unknown fields: {', '.join(unknown_fields)}"
+    if unknown_fields:
+        return False, f"Unknown fields: {', '.join(unknown_fields)}"
     
     # Recursively sanitize all values
     is_safe, result = sanitize_input(data, "request body")
@@ -406,6 +601,24 @@ def validate_required_fields(data, required_fields):
     if not data:
         return False, required_fields
     
+    # Common case: everything is there - no need to build the missing list
+    if has_required_fields(data, required_fields):
+        return True, []
+    
     missing = [f for f in required_fields if f not in data or not data[f]]
-    return len(missing) == 0, missing
+    return False, missing
+
+
+def has_required_fields(data, required_fields):
+    """
+    Check if all required fields are present and non-empty, stopping at the first miss
+    Returns: bool
+    """
+    if not data:
+        return False
+    
+    for field in required_fields:
+        if not data.get(field):
+            return False
+    return True
 